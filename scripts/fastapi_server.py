@@ -1,167 +1,263 @@
-import json
+from __future__ import annotations
+
+import asyncio
+import base64
+import functools
+import logging
 import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Dict, Optional, cast
-from uuid import uuid4
-from urllib.error import HTTPError, URLError
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
 from urllib.parse import urljoin
-from urllib.request import Request, urlopen
+from uuid import uuid4
 
+import anyio.to_thread
+import httpx
+import orjson
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, status
-from fastapi.concurrency import run_in_threadpool
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from uagents_core.contrib.protocols.chat import (
-    ChatAcknowledgement,
-    ChatMessage,
-    TextContent,
-    chat_protocol_spec,
-)
-from uagents_core.envelope import Envelope
-from uagents_core.identity import Identity
-from uagents_core.models import Model
-from uagents_core.utils.messages import parse_envelope
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+# uagents_core (and the pydantic v1 chat models it pulls in) is imported lazily by the chat
+# code paths, so workers serving only the status/pricing/payment stubs never load it.
+if TYPE_CHECKING:
+    from uagents_core.contrib.protocols.chat import ChatMessage
+    from uagents_core.envelope import Envelope
+    from uagents_core.identity import Identity
+
+log = logging.getLogger("foldspace.fastapi")
+# Installed by the app lifespan (not at import), so importing this module leaves logging alone.
+_log_queue_handler: Optional[QueueHandler] = None
+_log_listener: Optional[QueueListener] = None
+
+
+class _RawQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the message (and any traceback) in the logging thread;
+    # enqueueing the record untouched leaves all of that to the listener's StreamHandler.
+    # Callers must therefore not mutate log arguments after the logging call.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Log records are handed to a background listener thread, which formats them and writes
+# them to stderr off the event loop. The level is applied by _load_env_once (FOLDSPACE_LOG_LEVEL).
+def _start_logging() -> None:
+    global _log_queue_handler, _log_listener
+    if _log_listener is not None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    _log_queue_handler = _RawQueueHandler(log_queue)
+    log.addHandler(_log_queue_handler)
+    log.propagate = False
+    _log_listener = QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+
+
+def _stop_logging() -> None:
+    global _log_queue_handler, _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    log.removeHandler(_log_queue_handler)
+    log.propagate = True
+    _log_queue_handler = None
+    _log_listener = None
+
 
 BASE_DIR = Path(__file__).parent
 PROJECT_ROOT = BASE_DIR.parent
 DEFAULT_ENV_FILE = PROJECT_ROOT / ".env"
-env_override = os.getenv("FOLDSPACE_ENV_FILE")
-if env_override:
-    ENV_FILE = Path(env_override)
-else:
-    ENV_FILE = DEFAULT_ENV_FILE
+DEFAULT_AGENTVERSE_BASE_URL = "https://agentverse.ai/"
+# Mailbox submission endpoint documented at https://docs.agentverse.ai/api-reference/mailbox/submit-message-envelope
+AGENTVERSE_MAILBOX_SUBMIT_PATH = "v1/submit"
+CHAT_PLACEHOLDER_RESPONSE = "Message received"
 
-if not ENV_FILE.exists():
+
+def _ensure_trailing_slash(value: str) -> str:
+    return value if value.endswith("/") else f"{value}/"
+
+
+# Environment-derived settings; populated once by _load_env_once() from the app lifespan.
+ENV_FILE: Optional[Path] = None
+AGENTVERSE_API_KEY: Optional[str] = None
+AGENTVERSE_BASE_URL: Optional[str] = None
+AGENT_SEED_PHRASE: Optional[str] = None
+AGENTVERSE_BASE_URL_RESOLVED = DEFAULT_AGENTVERSE_BASE_URL
+AGENTVERSE_MAILBOX_SUBMIT_URL = urljoin(AGENTVERSE_BASE_URL_RESOLVED, AGENTVERSE_MAILBOX_SUBMIT_PATH)
+# Upper bound for the event loop's default executor (loop.run_in_executor / asyncio.to_thread).
+THREADPOOL_SIZE = 8
+# Tokens for anyio's default thread limiter, which Starlette uses for sync endpoints and
+# dependencies (anyio's own default is 40).
+ANYIO_THREAD_LIMIT = 100
+
+
+def _first_existing(*paths: Path) -> Optional[Path]:
+    for path in paths:
+        try:
+            os.stat(path)
+        except FileNotFoundError:
+            continue
+        return path
+    return None
+
+
+@functools.cache
+def _load_env_once() -> None:
+    """Resolve and load the .env file and read the settings above; later calls are no-ops."""
+    global ENV_FILE, AGENTVERSE_API_KEY, AGENTVERSE_BASE_URL, AGENT_SEED_PHRASE
+    global AGENTVERSE_BASE_URL_RESOLVED, AGENTVERSE_MAILBOX_SUBMIT_URL, THREADPOOL_SIZE
+    global ANYIO_THREAD_LIMIT
+
+    env_override = os.getenv("FOLDSPACE_ENV_FILE")
+    preferred_env = Path(env_override) if env_override else DEFAULT_ENV_FILE
     fallback_env = BASE_DIR / ".env"
-    if fallback_env.exists():
-        print(f"[FastAPI] Warning: {ENV_FILE} not found, falling back to {fallback_env}")
-        ENV_FILE = fallback_env
+    ENV_FILE = _first_existing(preferred_env, fallback_env) or preferred_env
+    if ENV_FILE is fallback_env:
+        log.warning("%s not found, falling back to %s", preferred_env, fallback_env)
 
-load_dotenv(ENV_FILE)
+    load_dotenv(ENV_FILE)
+    log.setLevel(os.getenv("FOLDSPACE_LOG_LEVEL", "WARNING").upper())
 
-DEFAULT_AGENTVERSE_BASE_URL = "https://agentverse.ai/"
+    AGENTVERSE_API_KEY = os.getenv("AGENTVERSE_API_KEY")
+    AGENTVERSE_BASE_URL = os.getenv("AGENTVERSE_BASE_URL")
+    AGENT_SEED_PHRASE = os.getenv("AGENT_SEED_PHRASE")
 
+    if not AGENTVERSE_API_KEY:
+        log.warning("AGENTVERSE_API_KEY is not configured; Agentverse features will be limited.")
 
-def _ensure_trailing_slash(value: str) -> str:
-    return value if value.endswith("/") else f"{value}/"
+    if not AGENTVERSE_BASE_URL:
+        log.warning("AGENTVERSE_BASE_URL is not configured; default Agentverse URL will be assumed.")
 
+    if not AGENT_SEED_PHRASE:
+        log.warning("AGENT_SEED_PHRASE is not configured; outbound chat replies will be skipped.")
 
-AGENTVERSE_API_KEY = os.getenv("AGENTVERSE_API_KEY")
-AGENTVERSE_BASE_URL = os.getenv("AGENTVERSE_BASE_URL")
-AGENT_SEED_PHRASE = os.getenv("AGENT_SEED_PHRASE")
-CHAT_PLACEHOLDER_RESPONSE = "Message received"
+    AGENTVERSE_BASE_URL_RESOLVED = _ensure_trailing_slash(AGENTVERSE_BASE_URL or DEFAULT_AGENTVERSE_BASE_URL)
+    AGENTVERSE_MAILBOX_SUBMIT_URL = urljoin(AGENTVERSE_BASE_URL_RESOLVED, AGENTVERSE_MAILBOX_SUBMIT_PATH)
+    THREADPOOL_SIZE = int(os.getenv("FOLDSPACE_THREADPOOL", "8"))
+    ANYIO_THREAD_LIMIT = int(os.getenv("FOLDSPACE_ANYIO_THREADS", "100"))
 
-if not AGENTVERSE_API_KEY:
-    print("[FastAPI] Warning: AGENTVERSE_API_KEY is not configured; Agentverse features will be limited.")
 
-if not AGENTVERSE_BASE_URL:
-    print("[FastAPI] Warning: AGENTVERSE_BASE_URL is not configured; default Agentverse URL will be assumed.")
+# Schema/protocol digests are computed on first use (chat_protocol_spec.digest rebuilds
+# the whole manifest on every access) so importing this module stays cheap.
+@functools.cache
+def _chat_message_digest() -> str:
+    from uagents_core.contrib.protocols.chat import ChatMessage
+    from uagents_core.models import Model
 
-if not AGENT_SEED_PHRASE:
-    print("[FastAPI] Warning: AGENT_SEED_PHRASE is not configured; outbound chat replies will be skipped.")
+    return Model.build_schema_digest(ChatMessage)
 
-AGENTVERSE_BASE_URL_RESOLVED = _ensure_trailing_slash(AGENTVERSE_BASE_URL or DEFAULT_AGENTVERSE_BASE_URL)
-# Mailbox submission endpoint documented at https://docs.agentverse.ai/api-reference/mailbox/submit-message-envelope
-AGENTVERSE_MAILBOX_SUBMIT_URL = urljoin(AGENTVERSE_BASE_URL_RESOLVED, "v1/submit")
 
-CHAT_MESSAGE_SCHEMA_DIGEST = Model.build_schema_digest(ChatMessage)
-CHAT_ACK_SCHEMA_DIGEST = Model.build_schema_digest(ChatAcknowledgement)
-CHAT_PROTOCOL_DIGEST = chat_protocol_spec.digest
+@functools.cache
+def _chat_ack_digest() -> str:
+    from uagents_core.contrib.protocols.chat import ChatAcknowledgement
+    from uagents_core.models import Model
+
+    return Model.build_schema_digest(ChatAcknowledgement)
+
+
+@functools.cache
+def _chat_protocol_digest() -> str:
+    from uagents_core.contrib.protocols.chat import chat_protocol_spec
+
+    return chat_protocol_spec.digest
+
+
+# Only the timestamp and msg_id of the placeholder reply vary, so its content list is
+# serialised once (as a `"content": [...]` JSON member) and spliced into every reply.
+@functools.cache
+def _placeholder_reply_content_json() -> str:
+    from uagents_core.contrib.protocols.chat import ChatMessage, TextContent
+
+    return ChatMessage(content=[TextContent(text=CHAT_PLACEHOLDER_RESPONSE)]).json(include={"content"})[1:-1]
+
 
+# Shared keep-alive pool for mailbox submissions; created on startup, closed on shutdown.
+HTTPX_CLIENT: Optional[httpx.AsyncClient] = None
+
+# Outbound envelopes are delivered by background workers so /chat does not wait on Agentverse.
+MAILBOX_QUEUE_SIZE = 1000
+MAILBOX_WORKER_COUNT = 4
+MAILBOX_MAX_ATTEMPTS = 3
+# On shutdown, queued envelopes get this long to be delivered before the workers are cancelled.
+MAILBOX_DRAIN_TIMEOUT = 15.0
+MAILBOX_QUEUE: Optional[asyncio.Queue[tuple[Envelope, str]]] = None
+MAILBOX_WORKERS: list[asyncio.Task[None]] = []
+MAILBOX_IN_FLIGHT = 0
+
+# Derived on startup rather than at import so tooling that only imports this module skips it.
 AGENT_IDENTITY: Optional[Identity] = None
 AGENT_ADDRESS: Optional[str] = None
 
-if AGENT_SEED_PHRASE:
+
+def _load_agent_identity() -> None:
+    global AGENT_IDENTITY, AGENT_ADDRESS
+    if not AGENT_SEED_PHRASE or AGENT_IDENTITY is not None:
+        return
+    from uagents_core.identity import Identity
+
     try:
         AGENT_IDENTITY = Identity.from_seed(AGENT_SEED_PHRASE, 0)
         AGENT_ADDRESS = AGENT_IDENTITY.address
-        print(f"[FastAPI] Agent identity loaded. Address: {AGENT_ADDRESS}")
+        log.info("Agent identity loaded. Address: %s", AGENT_ADDRESS)
     except Exception as identity_error:  # noqa: BLE001
         AGENT_IDENTITY = None
         AGENT_ADDRESS = None
-        print(f"[FastAPI] Failed to derive agent identity from AGENT_SEED_PHRASE: {identity_error}")
-
+        log.error("Failed to derive agent identity from AGENT_SEED_PHRASE: %s", identity_error)
 
-def _agentverse_mailbox_headers() -> Dict[str, str]:
-    headers: Dict[str, str] = {"Content-Type": "application/json"}
-    if AGENTVERSE_API_KEY:
-        headers["Authorization"] = f"Bearer {AGENTVERSE_API_KEY}"
-    return headers
 
+def _serialize_envelope(envelope: Envelope) -> bytes:
+    return orjson.dumps(envelope.model_dump(mode="json"), default=str)
 
-def _serialize_envelope(envelope: Envelope) -> str:
-    return json.dumps(envelope.model_dump(mode="json"), default=str)
 
-
-def _post_agentverse_envelope(envelope: Envelope, envelope_type: str) -> tuple[bool, Optional[str]]:
+async def submit_agentverse_envelope(envelope: Envelope, envelope_type: str) -> tuple[bool, Optional[str]]:
     payload_json = _serialize_envelope(envelope)
-    preview = payload_json if len(payload_json) <= 600 else f"{payload_json[:600]}..."
-    print(
-        "[FastAPI][Agentverse] Attempting to submit envelope",
-        {
-            "url": AGENTVERSE_MAILBOX_SUBMIT_URL,
-            "sender": envelope.sender,
-            "target": envelope.target,
-            "session": str(envelope.session),
-            "schemaDigest": envelope.schema_digest,
-            "protocolDigest": envelope.protocol_digest,
-            "envelopeType": envelope_type,
-            "payloadPreview": preview,
-        },
-    )
-
-    request = Request(
-        AGENTVERSE_MAILBOX_SUBMIT_URL,
-        data=payload_json.encode("utf-8"),
-        headers=_agentverse_mailbox_headers(),
-        method="POST",
-    )
-
-    try:
-        with urlopen(request, timeout=10) as response:
-            status_code = getattr(response, "status", response.getcode())
-            body = response.read()
-            body_preview = body.decode("utf-8", "ignore") if body else ""
-            if len(body_preview) > 300:
-                body_preview = f"{body_preview[:300]}..."
-            print(
-                "[FastAPI][Agentverse] Envelope submitted successfully",
-                {
-                    "status": status_code,
-                    "responseBytes": len(body),
-                    "responsePreview": body_preview,
-                    "envelopeType": envelope_type,
-                },
-            )
-            return True, None
-    except HTTPError as exc:
-        error_body = exc.read().decode("utf-8", "ignore")
-        print(
-            "[FastAPI][Agentverse] HTTP error while submitting envelope",
+    if log.isEnabledFor(logging.DEBUG):
+        preview = payload_json[:600].decode("utf-8", "ignore")
+        if len(payload_json) > 600:
+            preview = f"{preview}..."
+        log.debug(
+            "[Agentverse] Attempting to submit envelope %s",
             {
-                "status": exc.code,
-                "reason": exc.reason,
-                "body": error_body,
                 "url": AGENTVERSE_MAILBOX_SUBMIT_URL,
+                "sender": envelope.sender,
+                "target": envelope.target,
+                "session": str(envelope.session),
+                "schemaDigest": envelope.schema_digest,
+                "protocolDigest": envelope.protocol_digest,
                 "envelopeType": envelope_type,
+                "payloadPreview": preview,
             },
         )
-        return False, f"HTTP {exc.code}: {error_body or exc.reason}"
-    except URLError as exc:
-        print(
-            "[FastAPI][Agentverse] Network error while submitting envelope",
+
+    if HTTPX_CLIENT is None:
+        return False, "Agentverse HTTP client is not initialised"
+
+    try:
+        response = await HTTPX_CLIENT.post(
+            AGENTVERSE_MAILBOX_SUBMIT_PATH,
+            content=payload_json,
+        )
+    except httpx.HTTPError as exc:
+        log.warning(
+            "[Agentverse] Network error while submitting envelope %s",
             {
                 "url": AGENTVERSE_MAILBOX_SUBMIT_URL,
                 "error": str(exc),
                 "envelopeType": envelope_type,
             },
         )
-        return False, str(getattr(exc, "reason", exc))
+        return False, str(exc) or type(exc).__name__
     except Exception as exc:  # noqa: BLE001
-        print(
-            "[FastAPI][Agentverse] Unexpected error while submitting envelope",
+        log.exception(
+            "[Agentverse] Unexpected error while submitting envelope %s",
             {
                 "url": AGENTVERSE_MAILBOX_SUBMIT_URL,
                 "error": str(exc),
@@ -170,11 +266,67 @@ def _post_agentverse_envelope(envelope: Envelope, envelope_type: str) -> tuple[b
         )
         return False, str(exc)
 
-    return False, "Unknown Agentverse response state"
+    if response.is_success:
+        if log.isEnabledFor(logging.DEBUG):
+            body_preview = response.text
+            if len(body_preview) > 300:
+                body_preview = f"{body_preview[:300]}..."
+            log.debug(
+                "[Agentverse] Envelope submitted successfully %s",
+                {
+                    "status": response.status_code,
+                    "responseBytes": len(response.content),
+                    "responsePreview": body_preview,
+                    "envelopeType": envelope_type,
+                },
+            )
+        return True, None
 
+    error_body = response.text
+    log.warning(
+        "[Agentverse] HTTP error while submitting envelope %s",
+        {
+            "status": response.status_code,
+            "reason": response.reason_phrase,
+            "body": error_body,
+            "url": AGENTVERSE_MAILBOX_SUBMIT_URL,
+            "envelopeType": envelope_type,
+        },
+    )
+    return False, f"HTTP {response.status_code}: {error_body or response.reason_phrase}"
+
+
+async def _deliver_agentverse_envelope(envelope: Envelope, envelope_type: str) -> None:
+    error_detail: Optional[str] = None
+    for attempt in range(MAILBOX_MAX_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(2**attempt)
+        success, error_detail = await submit_agentverse_envelope(envelope, envelope_type)
+        if success:
+            return
+    log.error(
+        "[Agentverse] Giving up on envelope %s",
+        {
+            "target": envelope.target,
+            "envelopeType": envelope_type,
+            "attempts": MAILBOX_MAX_ATTEMPTS,
+            "error": error_detail,
+        },
+    )
 
-async def submit_agentverse_envelope(envelope: Envelope, envelope_type: str) -> tuple[bool, Optional[str]]:
-    return await run_in_threadpool(_post_agentverse_envelope, envelope, envelope_type)
+
+async def _mailbox_worker(mailbox_queue: asyncio.Queue[tuple[Envelope, str]]) -> None:
+    global MAILBOX_IN_FLIGHT
+    while True:
+        envelope, envelope_type = await mailbox_queue.get()
+        MAILBOX_IN_FLIGHT += 1
+        try:
+            await _deliver_agentverse_envelope(envelope, envelope_type)
+        except Exception:  # noqa: BLE001
+            log.exception("[Agentverse] Mailbox worker error for %s", envelope_type)
+        finally:
+            MAILBOX_IN_FLIGHT -= 1
+            mailbox_queue.task_done()
 
 
 def _build_ack_envelope(
@@ -183,6 +335,9 @@ def _build_ack_envelope(
     metadata: Optional[Dict[str, str]],
     identity: Identity,
 ) -> Envelope:
+    from uagents_core.contrib.protocols.chat import ChatAcknowledgement
+    from uagents_core.envelope import Envelope
+
     acknowledgement = ChatAcknowledgement(
         acknowledged_msg_id=message.msg_id,
         metadata=metadata,
@@ -192,36 +347,109 @@ def _build_ack_envelope(
         sender=identity.address,
         target=incoming.sender,
         session=incoming.session,
-        schema_digest=CHAT_ACK_SCHEMA_DIGEST,
-        protocol_digest=CHAT_PROTOCOL_DIGEST,
+        schema_digest=_chat_ack_digest(),
+        protocol_digest=_chat_protocol_digest(),
     )
     envelope.encode_payload(acknowledgement.model_dump_json())
     envelope.sign(identity)
     return envelope
 
 
+def _placeholder_reply_json(timestamp: str) -> str:
+    return f'{{"timestamp": "{timestamp}", "msg_id": "{uuid4()}", {_placeholder_reply_content_json()}}}'
+
+
 def _build_placeholder_message_envelope(
     incoming: Envelope,
-    reply_text: str,
     identity: Identity,
+    timestamp: str,
 ) -> Envelope:
-    message = ChatMessage(content=[TextContent(text=reply_text)])
+    from uagents_core.envelope import Envelope
+
     envelope = Envelope(
         version=incoming.version,
         sender=identity.address,
         target=incoming.sender,
         session=incoming.session,
-        schema_digest=CHAT_MESSAGE_SCHEMA_DIGEST,
-        protocol_digest=CHAT_PROTOCOL_DIGEST,
+        schema_digest=_chat_message_digest(),
+        protocol_digest=_chat_protocol_digest(),
     )
-    envelope.encode_payload(message.model_dump_json())
+    envelope.encode_payload(_placeholder_reply_json(timestamp))
     envelope.sign(identity)
     return envelope
 
+
+def _tune_threadpool() -> None:
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREADPOOL_SIZE, thread_name_prefix="foldspace")
+    )
+    # Starlette runs sync endpoints and dependencies through anyio's limiter, not the loop executor.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = ANYIO_THREAD_LIMIT
+
+
+def _start_mailbox_delivery() -> None:
+    global HTTPX_CLIENT, MAILBOX_QUEUE
+    _load_agent_identity()
+    # HTTP/2 multiplexes concurrent ack/reply submissions over one connection; the long
+    # keep-alive expiry keeps that TLS session warm between chats.
+    HTTPX_CLIENT = httpx.AsyncClient(
+        base_url=AGENTVERSE_BASE_URL_RESOLVED,
+        headers={
+            "Content-Type": "application/json",
+            **({"Authorization": f"Bearer {AGENTVERSE_API_KEY}"} if AGENTVERSE_API_KEY else {}),
+        },
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+        timeout=httpx.Timeout(10.0, connect=3.0),
+    )
+    MAILBOX_QUEUE = asyncio.Queue(maxsize=MAILBOX_QUEUE_SIZE)
+    MAILBOX_WORKERS[:] = [
+        asyncio.create_task(_mailbox_worker(MAILBOX_QUEUE)) for _ in range(MAILBOX_WORKER_COUNT)
+    ]
+
+
+async def _stop_mailbox_delivery() -> None:
+    global HTTPX_CLIENT, MAILBOX_QUEUE
+    if MAILBOX_QUEUE is not None:
+        try:
+            await asyncio.wait_for(MAILBOX_QUEUE.join(), timeout=MAILBOX_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.error(
+                "[Agentverse] Mailbox drain timed out after %gs; dropping %d envelope(s) "
+                "(%d queued, %d in flight).",
+                MAILBOX_DRAIN_TIMEOUT,
+                MAILBOX_QUEUE.qsize() + MAILBOX_IN_FLIGHT,
+                MAILBOX_QUEUE.qsize(),
+                MAILBOX_IN_FLIGHT,
+            )
+    for worker in MAILBOX_WORKERS:
+        worker.cancel()
+    await asyncio.gather(*MAILBOX_WORKERS, return_exceptions=True)
+    MAILBOX_WORKERS.clear()
+    MAILBOX_QUEUE = None
+    if HTTPX_CLIENT is not None:
+        await HTTPX_CLIENT.aclose()
+        HTTPX_CLIENT = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    _start_logging()
+    _load_env_once()
+    _tune_threadpool()
+    _start_mailbox_delivery()
+    try:
+        yield
+    finally:
+        await _stop_mailbox_delivery()
+        _stop_logging()
+
+
 app = FastAPI(
     title="Foldspace FastAPI Adapter",
     description="FastAPI reimplementation of the Foldspace Express adapter with placeholder handlers.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
@@ -232,16 +460,14 @@ class PricingRequest(BaseModel):
     input: Optional[JSONDict] = None
 
 
+# The stub endpoints below read their bodies through _json_object_body; these models only
+# document the accepted fields in the OpenAPI schema.
 class PaymentRequest(BaseModel):
     payload: Optional[JSONDict] = None
     requirements: Optional[JSONDict] = None
     options: Optional[JSONDict] = None
 
 
-class SessionPaymentRequest(PaymentRequest):
-    pass
-
-
 class AgentverseRegisterRequest(BaseModel):
     address: Optional[str] = None
     challenge: Optional[str] = None
@@ -253,77 +479,184 @@ class AgentverseRegisterRequest(BaseModel):
     prefix: Optional[str] = None
 
 
-def _placeholder_response(endpoint: str, method: str, **extra: Any) -> JSONDict:
-    base: JSONDict = {
+def _openapi_request_body(schema: JSONDict) -> JSONDict:
+    """openapi_extra entry documenting a JSON body for routes that read the raw request."""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+_PAYMENT_OPENAPI = _openapi_request_body(PaymentRequest.model_json_schema())
+
+
+def _json_decode_error(exc: orjson.JSONDecodeError) -> RequestValidationError:
+    """The 422 FastAPI emits for an undecodable body (loc carries the error position)."""
+    return RequestValidationError(
+        [
+            {
+                "type": "json_invalid",
+                "loc": ("body", exc.pos),
+                "msg": "JSON decode error",
+                "input": {},
+                "ctx": {"error": exc.msg},
+            }
+        ]
+    )
+
+
+def _body_validation_error(exc: ValidationError, raw: bytes) -> RequestValidationError:
+    """Re-raise body validation errors the way FastAPI reports them (422, loc prefixed with "body")."""
+    errors = exc.errors(include_url=False)
+    if errors[0]["type"] == "json_invalid":
+        # pydantic's JSON errors differ from FastAPI's; rebuild the FastAPI shape instead.
+        if not raw:
+            return RequestValidationError(
+                [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+            )
+        try:
+            orjson.loads(raw)
+        except orjson.JSONDecodeError as decode_error:
+            return _json_decode_error(decode_error)
+    return RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+
+
+def _placeholder_base(endpoint: str, method: str) -> JSONDict:
+    return {
         "endpoint": endpoint,
         "method": method,
         "status": "placeholder",
         "message": "FastAPI stub response.",
     }
-    base.update({k: v for k, v in extra.items() if v is not None})
-    return base
 
 
-@app.get("/")
+# Per-endpoint base bodies are built once; handlers only merge in their dynamic fields.
+_CHAT_BASE = _placeholder_base("/chat", "POST")
+_PRICING_BASES = {method: _placeholder_base("/request_pricing", method) for method in ("GET", "POST")}
+_SESSION_BASE = _placeholder_base("/sessions/{sessionId}", "GET")
+_SESSION_PAYMENT_BASE = _placeholder_base("/sessions/{sessionId}/payment", "POST")
+_RESOURCES_BASE = _placeholder_base("/facilitator/resources", "POST")
+_VERIFY_BASE = _placeholder_base("/payments/verify", "POST")
+_SETTLE_BASE = _placeholder_base("/payments/settle", "POST")
+_VERIFY_ONCHAIN_BASE = _placeholder_base("/payments/verify/onchain", "POST")
+_SETTLE_ONCHAIN_BASE = _placeholder_base("/payments/settle/onchain", "POST")
+_REGISTER_BASE = _placeholder_base("/agentverse/register", "POST")
+
+
+def _placeholder_body(base: JSONDict, /, **extra: Any) -> JSONDict:
+    body = base.copy()
+    for key, value in extra.items():
+        if value is not None:
+            body[key] = value
+    return body
+
+
+def _json_response(content: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    # Encoding with orjson and returning a plain Response skips FastAPI's jsonable_encoder
+    # pass over nested payload/requirements dicts (orjson handles UUIDs natively) without
+    # relying on ORJSONResponse, which newer FastAPI releases deprecate.
+    return Response(
+        orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _placeholder_response(base: JSONDict, /, **extra: Any) -> Response:
+    return _json_response(_placeholder_body(base, **extra))
+
+
+async def _json_object_body(request: Request) -> JSONDict:
+    """Decode a JSON object body with orjson, skipping model validation for stub endpoints."""
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as exc:
+        # Same error shape FastAPI emits for undecodable bodies, so every body error is a 422.
+        raise _json_decode_error(exc) from exc
+    if not isinstance(body, dict):
+        raise RequestValidationError(
+            [{"type": "dict_type", "loc": ("body",), "msg": "Input should be a valid dictionary", "input": body}]
+        )
+    return body
+
+
+# Static endpoint bodies are encoded once; handlers return them without re-serialising.
+_ROOT_BODY = b'{"message":"Foldspace Protocol chat adapter is running."}'
+_HEALTH_BODY = b'{"status":"ok"}'
+_STATUS_BODY = b'{"status":"OK - Agent is running"}'
+_FACILITATOR_SUPPORTED_BODY = orjson.dumps(
+    {**_placeholder_base("/facilitator/supported", "GET"), "kinds": ["local_stub"]}
+)
+
+
+@app.get("/", response_class=Response)
 async def root():
-    return {"message": "Foldspace Protocol chat adapter is running."}
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
-@app.get("/health")
+@app.get("/health", response_class=Response)
 async def health():
-    return {"status": "ok"}
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
-@app.get("/status")
+@app.get("/status", response_class=Response)
 async def status_check():
-    return {"status": "OK - Agent is running"}
+    return Response(_STATUS_BODY, media_type="application/json")
 
 
-@app.post("/chat")
-async def handle_chat(env: Envelope):
-    envelope_meta = {
-        "sender": env.sender,
-        "recipient": getattr(env, "recipient", None),
-        "protocol": getattr(env, "protocol", None),
-        "session": getattr(env, "session", None),
-        "trace": getattr(env, "trace", None),
-    }
-    print(f"[FastAPI][Chat] Envelope received: {envelope_meta}")
+@app.post("/chat", response_model=None)
+async def handle_chat(request: Request):
+    from uagents_core.contrib.protocols.chat import ChatMessage
+    from uagents_core.envelope import Envelope
 
+    # Validate the envelope straight from the raw body instead of going through
+    # FastAPI's body parsing, then surface failures in FastAPI's usual 422 shape.
+    raw = await request.body()
     try:
-        msg = cast(ChatMessage, parse_envelope(env, ChatMessage))
+        env = Envelope.model_validate_json(raw)
+    except ValidationError as exc:
+        raise _body_validation_error(exc, raw) from exc
+
+    # Envelope has a fixed schema: sender and session are the only routing fields it carries.
+    sender, session = env.sender, env.session
+    log.debug("[Chat] Envelope received: sender=%s session=%s", sender, session)
+
+    try:
+        # Parse the payload bytes once with ChatMessage directly. parse_envelope swallows
+        # validation errors and hands back the raw string; model construction without
+        # validation would leave content items as dicts, so msg.text() would come back empty.
+        msg = ChatMessage.parse_raw(base64.b64decode(env.payload or ""))
     except Exception as exc:  # noqa: BLE001
-        print(f"[FastAPI][Chat] Failed to parse envelope: {exc}")
+        log.warning("[Chat] Failed to parse envelope: %s", exc)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
     message_text = msg.text()
-    preview = message_text if not message_text or len(message_text) <= 200 else f"{message_text[:200]}..."
-    print(
-        "[FastAPI][Chat] Parsed message",
-        {
-            "message_id": getattr(msg, "id", None),
-            "payload_type": type(msg).__name__,
-            "preview": preview,
-        },
-    )
-
-    print(f"[FastAPI][Chat] Placeholder mode active. Reply text: '{CHAT_PLACEHOLDER_RESPONSE}'.")
+    message_length = len(message_text)
+    if log.isEnabledFor(logging.DEBUG):
+        preview = message_text if message_length <= 200 else f"{message_text[:200]}..."
+        log.debug(
+            "[Chat] Parsed message %s",
+            {
+                "message_id": str(msg.msg_id),
+                "payload_type": type(msg).__name__,
+                "preview": preview,
+            },
+        )
+        log.debug("[Chat] Placeholder mode active. Reply text: '%s'.", CHAT_PLACEHOLDER_RESPONSE)
 
+    # One clock read per request, shared by the ack metadata and the placeholder reply.
+    received_at = datetime.now(timezone.utc).isoformat()
     ack_metadata: Dict[str, str] = {
         "placeholder": "true",
         "placeholder_response": CHAT_PLACEHOLDER_RESPONSE,
-        "received_at": datetime.now(timezone.utc).isoformat(),
+        "received_at": received_at,
     }
     message_id = getattr(msg, "msg_id", None)
     if message_id:
         ack_metadata["message_id"] = str(message_id)
-    session_value = envelope_meta.get("session")
-    if session_value:
-        ack_metadata["session"] = str(session_value)
-    if env.sender:
-        ack_metadata["sender"] = env.sender
-    if preview:
-        ack_metadata["message_preview"] = preview
+    if session:
+        ack_metadata["session"] = str(session)
+    if sender:
+        ack_metadata["sender"] = sender
+    if message_length:
+        ack_metadata["message_length"] = str(message_length)
     if not message_text:
         ack_metadata["placeholder_reason"] = "empty_message"
 
@@ -344,168 +677,238 @@ async def handle_chat(env: Envelope):
             )
         except Exception as build_error:  # noqa: BLE001
             warning_messages.append(f"Failed to build acknowledgement envelope: {build_error}")
-            print(f"[FastAPI][Chat] Error constructing acknowledgement: {build_error}")
+            log.error("[Chat] Error constructing acknowledgement: %s", build_error)
 
         try:
             reply_envelope = _build_placeholder_message_envelope(
                 incoming=env,
-                reply_text=CHAT_PLACEHOLDER_RESPONSE,
                 identity=AGENT_IDENTITY,
+                timestamp=received_at,
             )
         except Exception as build_error:  # noqa: BLE001
             warning_messages.append(f"Failed to build chat reply envelope: {build_error}")
-            print(f"[FastAPI][Chat] Error constructing reply envelope: {build_error}")
-
-        async def _submit_and_record(envelope: Envelope, envelope_type: str) -> None:
-            success, error_detail = await submit_agentverse_envelope(envelope, envelope_type)
-            delivery_statuses.append(
-                {
-                    "status": "submitted" if success else "failed",
-                    "destination": env.sender,
-                    "transport": "agentverse_mailbox",
-                    "messageType": envelope_type,
-                    "detail": error_detail,
-                }
-            )
-            if not success and error_detail:
-                warning_messages.append(f"{envelope_type} submission failed: {error_detail}")
+            log.error("[Chat] Error constructing reply envelope: %s", build_error)
 
+        pending: list[tuple[Envelope, str]] = []
         if ack_envelope:
-            await _submit_and_record(ack_envelope, "chat_acknowledgement")
+            pending.append((ack_envelope, "chat_acknowledgement"))
         if reply_envelope:
-            await _submit_and_record(reply_envelope, "chat_message")
+            pending.append((reply_envelope, "chat_message"))
 
-        attempts = len(delivery_statuses)
-        successes = sum(1 for status_entry in delivery_statuses if status_entry["status"] == "submitted")
-        if attempts == 0:
+        if not pending:
             send_status = "mailbox_construct_failed"
-        elif successes == attempts:
-            send_status = "mailbox_submitted"
-        elif successes == 0:
+        elif MAILBOX_QUEUE is None:
             send_status = "mailbox_failed"
+            warning_messages.append("Mailbox delivery is not running; outbound envelopes dropped.")
         else:
-            send_status = "mailbox_partial"
+            # Never wait for queue space: a full queue means the workers are behind, so the
+            # envelope is dropped and reported rather than holding up the /chat response.
+            dropped = 0
+            for envelope, envelope_type in pending:
+                try:
+                    MAILBOX_QUEUE.put_nowait((envelope, envelope_type))
+                except asyncio.QueueFull:
+                    dropped += 1
+                    queue_status = "dropped"
+                else:
+                    queue_status = "queued"
+                delivery_statuses.append(
+                    {
+                        "status": queue_status,
+                        "destination": sender,
+                        "transport": "agentverse_mailbox",
+                        "messageType": envelope_type,
+                    }
+                )
+            if dropped:
+                send_status = "mailbox_failed"
+                warning_messages.append(f"Mailbox queue is full; {dropped} outbound envelope(s) dropped.")
+                log.warning("[Chat] Mailbox queue is full; dropped %d outbound envelope(s).", dropped)
+            else:
+                send_status = "mailbox_queued"
     else:
         warning_messages.append("AGENT_SEED_PHRASE missing; outbound placeholder skipped.")
-        print("[FastAPI][Chat] AGENT_SEED_PHRASE missing; outbound placeholder skipped.")
+        log.warning("[Chat] AGENT_SEED_PHRASE missing; outbound placeholder skipped.")
 
     return _placeholder_response(
-        "/chat",
-        "POST",
+        _CHAT_BASE,
         placeholderResponse=CHAT_PLACEHOLDER_RESPONSE,
-        messagePreview=preview,
+        messageLength=message_length,
         sendStatus=send_status,
         deliveryStatuses=delivery_statuses or None,
         warning=" | ".join(warning_messages) if warning_messages else None,
         ackMetadata=ack_metadata,
-        **envelope_meta,
+        sender=sender,
+        session=session,
     )
 
 
-@app.get("/request_pricing")
+_default_openapi = app.openapi
+
+
+def _openapi_with_chat_envelope() -> Dict[str, Any]:
+    # /chat reads the raw body so Envelope stays a lazy import; its schema is only pulled in
+    # when the OpenAPI document is first generated.
+    if app.openapi_schema is None:
+        from uagents_core.envelope import Envelope
+
+        schema = _default_openapi()
+        schema["paths"]["/chat"]["post"].update(_openapi_request_body(Envelope.model_json_schema()))
+    return app.openapi_schema
+
+
+app.openapi = _openapi_with_chat_envelope
+
+
+# Without an input echo the 402 pricing bodies differ only by sessionId, so they are
+# encoded once and the fresh id is spliced in per request.
+_SESSION_ID_MARKER = b'"__SID__"'
+_PRICING_402_TEMPLATES: Dict[str, bytes] = {
+    method: orjson.dumps({**base, "sessionId": "__SID__"})
+    for method, base in _PRICING_BASES.items()
+}
+
+
+# Session ids stay 128-bit random hex, but entropy is drawn in batches so most requests
+# pop a pre-formatted id instead of making a urandom syscall.
+_SESSION_ID_BATCH = 256
+_SESSION_ID_POOL: list[str] = []
+
+
+def _next_session_id() -> str:
+    if not _SESSION_ID_POOL:
+        raw = os.urandom(16 * _SESSION_ID_BATCH).hex()
+        _SESSION_ID_POOL.extend(raw[i : i + 32] for i in range(0, len(raw), 32))
+    return _SESSION_ID_POOL.pop()
+
+
+def _pricing_response(method: str, input: Any) -> Response:
+    session_id = _next_session_id()
+    if input is None:
+        body = _PRICING_402_TEMPLATES[method].replace(_SESSION_ID_MARKER, orjson.dumps(session_id), 1)
+        return Response(body, status_code=status.HTTP_402_PAYMENT_REQUIRED, media_type="application/json")
+    content = _placeholder_body(_PRICING_BASES[method], sessionId=session_id, input=input)
+    return _json_response(content, status_code=status.HTTP_402_PAYMENT_REQUIRED)
+
+
+@app.get("/request_pricing", response_model=None)
 async def get_pricing(input: Optional[str] = None):
-    session_id = str(uuid4())
-    content = _placeholder_response("/request_pricing", "GET", sessionId=session_id, input=input)
-    return JSONResponse(status_code=status.HTTP_402_PAYMENT_REQUIRED, content=content)
+    return _pricing_response("GET", input)
 
 
-@app.post("/request_pricing")
+@app.post("/request_pricing", response_model=None)
 async def post_pricing(body: PricingRequest):
-    session_id = str(uuid4())
-    content = _placeholder_response("/request_pricing", "POST", sessionId=session_id, input=body.input)
-    return JSONResponse(status_code=status.HTTP_402_PAYMENT_REQUIRED, content=content)
+    return _pricing_response("POST", body.input)
 
 
-@app.get("/sessions/{session_id}")
+@app.get("/sessions/{session_id}", response_model=None)
 async def get_session(session_id: str):
-    return _placeholder_response("/sessions/{sessionId}", "GET", sessionId=session_id)
+    return _placeholder_response(_SESSION_BASE, sessionId=session_id)
 
 
-@app.post("/sessions/{session_id}/payment")
-async def post_session_payment(session_id: str, body: SessionPaymentRequest):
-    if not body.payload or not body.requirements:
+@app.post("/sessions/{session_id}/payment", response_model=None, openapi_extra=_PAYMENT_OPENAPI)
+async def post_session_payment(session_id: str, body: JSONDict = Depends(_json_object_body)):
+    payload = body.get("payload")
+    requirements = body.get("requirements")
+    if not payload or not requirements:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="payload and requirements are required",
         )
     return _placeholder_response(
-        "/sessions/{sessionId}/payment",
-        "POST",
+        _SESSION_PAYMENT_BASE,
         sessionId=session_id,
-        payload=body.payload,
-        requirements=body.requirements,
+        payload=payload,
+        requirements=requirements,
     )
 
 
-@app.post("/facilitator/resources")
+@app.post("/facilitator/resources", response_model=None)
 async def list_resources(body: JSONDict):
-    return _placeholder_response("/facilitator/resources", "POST", request=body)
+    return _placeholder_response(_RESOURCES_BASE, request=body)
 
 
-@app.get("/facilitator/supported")
+@app.get("/facilitator/supported", response_class=Response)
 async def supported_facilitator():
-    return _placeholder_response("/facilitator/supported", "GET", kinds=["local_stub"])
+    return Response(_FACILITATOR_SUPPORTED_BODY, media_type="application/json")
 
 
-@app.post("/payments/verify")
-async def verify_payment(body: PaymentRequest):
+@app.post("/payments/verify", response_model=None, openapi_extra=_PAYMENT_OPENAPI)
+async def verify_payment(body: JSONDict = Depends(_json_object_body)):
     return _placeholder_response(
-        "/payments/verify",
-        "POST",
-        payload=body.payload,
-        requirements=body.requirements,
+        _VERIFY_BASE,
+        payload=body.get("payload"),
+        requirements=body.get("requirements"),
     )
 
 
-@app.post("/payments/settle")
-async def settle_payment(body: PaymentRequest):
+@app.post("/payments/settle", response_model=None, openapi_extra=_PAYMENT_OPENAPI)
+async def settle_payment(body: JSONDict = Depends(_json_object_body)):
     return _placeholder_response(
-        "/payments/settle",
-        "POST",
-        payload=body.payload,
-        requirements=body.requirements,
+        _SETTLE_BASE,
+        payload=body.get("payload"),
+        requirements=body.get("requirements"),
     )
 
 
-@app.post("/payments/verify/onchain")
-async def verify_onchain(body: PaymentRequest):
+@app.post("/payments/verify/onchain", response_model=None, openapi_extra=_PAYMENT_OPENAPI)
+async def verify_onchain(body: JSONDict = Depends(_json_object_body)):
     return _placeholder_response(
-        "/payments/verify/onchain",
-        "POST",
-        payload=body.payload,
-        requirements=body.requirements,
+        _VERIFY_ONCHAIN_BASE,
+        payload=body.get("payload"),
+        requirements=body.get("requirements"),
     )
 
 
-@app.post("/payments/settle/onchain")
-async def settle_onchain(body: PaymentRequest):
+@app.post("/payments/settle/onchain", response_model=None, openapi_extra=_PAYMENT_OPENAPI)
+async def settle_onchain(body: JSONDict = Depends(_json_object_body)):
     return _placeholder_response(
-        "/payments/settle/onchain",
-        "POST",
-        payload=body.payload,
-        requirements=body.requirements,
+        _SETTLE_ONCHAIN_BASE,
+        payload=body.get("payload"),
+        requirements=body.get("requirements"),
     )
 
 
-@app.post("/agentverse/register")
-async def register_agent(body: AgentverseRegisterRequest):
-    if not body.address or not body.challenge or not (body.challengeResponse or body.challenge_response):
+@app.post(
+    "/agentverse/register",
+    response_model=None,
+    openapi_extra=_openapi_request_body(AgentverseRegisterRequest.model_json_schema()),
+)
+async def register_agent(body: JSONDict = Depends(_json_object_body)):
+    address = body.get("address")
+    if not address or not body.get("challenge") or not (
+        body.get("challengeResponse") or body.get("challenge_response")
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="address, challenge, and challengeResponse are required",
         )
 
     return _placeholder_response(
-        "/agentverse/register",
-        "POST",
-        address=body.address,
-        endpoint=body.endpoint,
-        agentType=body.agentType or body.agent_type,
+        _REGISTER_BASE,
+        address=address,
+        agentEndpoint=body.get("endpoint"),
+        agentType=body.get("agentType") or body.get("agent_type"),
     )
 
 
 if __name__ == "__main__":
+    import importlib.util
+
     import uvicorn
 
+    # PORT, FOLDSPACE_DEV and WEB_CONCURRENCY may come from the .env file as well.
+    _load_env_once()
     port = int(os.getenv("PORT", "3000"))
-    uvicorn.run("scripts.fastapi_server:app", host="0.0.0.0", port=port, reload=True)
+    uvicorn.run(
+        "scripts.fastapi_server:app",
+        host="0.0.0.0",
+        port=port,
+        reload=os.getenv("FOLDSPACE_DEV") == "1",
+        # uvloop is not installed on Windows (see requirements.txt); fall back to asyncio there.
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import functools
 import json
-from typing import Any, Dict, List
+import re
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping
 
 
-_EMBEDDING_SOURCE = r"""
-{
+_EMBEDDING_SOURCE: Dict[str, Any] = {
   "smart_chunk_version": "2025-10-24.1",
   "source_metadata": {
     "LLM_EXPORT_VERSION": "1",
@@ -282,7 +285,7 @@ _EMBEDDING_SOURCE = r"""
       "canonical_facts": {
         "method": "GET",
         "path": "/status",
-        "query": { "request_id": { "type": "string", "required": true } },
+        "query": { "request_id": { "type": "string", "required": True } },
         "headers": { "Authorization": "Bearer YOUR_API_KEY" },
         "responses": {
           "200.pending": {
@@ -386,32 +389,37 @@ _EMBEDDING_SOURCE = r"""
     }
   ]
 }
-"""
 
+# The embedding is read-only at runtime: chunks and retrieval keys become tuples, chunk ids
+# are interned, and the top level is exposed through a read-only proxy.
+for _chunk in _EMBEDDING_SOURCE["chunks"]:
+    _chunk["id"] = sys.intern(_chunk["id"])
+    if "retrieval_keys" in _chunk:
+        _chunk["retrieval_keys"] = tuple(_chunk["retrieval_keys"])
+_EMBEDDING_SOURCE["chunks"] = tuple(_EMBEDDING_SOURCE["chunks"])
+INSTRUCTION_EMBEDDING: Mapping[str, Any] = MappingProxyType(_EMBEDDING_SOURCE)
 
-INSTRUCTION_EMBEDDING: Dict[str, Any] = json.loads(_EMBEDDING_SOURCE)
+# Internal callers already hold exact chunk ids, so they skip keyword normalisation.
+_CHUNKS_BY_ID: Dict[str, Dict[str, Any]] = {chunk["id"]: chunk for chunk in INSTRUCTION_EMBEDDING["chunks"]}
 
 
 def _summarize_models(section_id: str) -> str:
-    for chunk in INSTRUCTION_EMBEDDING["chunks"]:
-        if chunk["id"] == section_id:
-            models: List[Dict[str, Any]] = chunk["canonical_facts"]["models"]
-            lines = [f"- {entry['name']} (`{entry['key']}`)" for entry in models]
-            note = chunk["canonical_facts"].get("aliases_and_inconsistencies")
-            extra = ""
-            if note:
-                alias_info = note.get("aliases", {})
-                alias_lines = ", ".join(f"{src}→{dest}" for src, dest in alias_info.items())
-                extra = f"\n  Aliases: {alias_lines}"
-            return "\n".join(lines) + extra
-    return ""
+    chunk = _CHUNKS_BY_ID.get(section_id)
+    if not chunk:
+        return ""
+    models: List[Dict[str, Any]] = chunk["canonical_facts"]["models"]
+    lines = [f"- {entry['name']} (`{entry['key']}`)" for entry in models]
+    note = chunk["canonical_facts"].get("aliases_and_inconsistencies")
+    extra = ""
+    if note:
+        alias_info = note.get("aliases", {})
+        alias_lines = ", ".join(f"{src}→{dest}" for src, dest in alias_info.items())
+        extra = f"\n  Aliases: {alias_lines}"
+    return "\n".join(lines) + extra
 
 
 def _summarize_pricing() -> str:
-    rates_chunk = next(
-        (c for c in INSTRUCTION_EMBEDDING["chunks"] if c["id"] == "pricing.api.v1"),
-        None,
-    )
+    rates_chunk = _CHUNKS_BY_ID.get("pricing.api.v1")
     if not rates_chunk:
         return ""
     facts = rates_chunk["canonical_facts"]
@@ -428,6 +436,7 @@ def _summarize_pricing() -> str:
     return "\n".join(lines)
 
 
+@functools.cache
 def build_instruction_text() -> str:
     base = [
         "Foldspace T2V • Enter a prompt, choose image & video models, then render.",
@@ -456,29 +465,92 @@ def get_instruction_text() -> str:
     return INSTRUCTION_TEXT
 
 
+# Every lowercased id/title/retrieval key maps to its chunk; the first chunk to claim a
+# key wins, matching the order a linear scan would have found it in.
+_KEYWORD_INDEX: Dict[str, Dict[str, Any]] = {}
+for _chunk in INSTRUCTION_EMBEDDING["chunks"]:
+    for _key in (_chunk["id"], _chunk["title"], *_chunk.get("retrieval_keys", [])):
+        _KEYWORD_INDEX.setdefault(sys.intern(_key.lower()), _chunk)
+del _chunk, _key
+
+
 def find_chunk(keyword: str) -> Dict[str, Any] | None:
-    normalized = keyword.strip().lower()
-    if not normalized:
-        return None
-    for chunk in INSTRUCTION_EMBEDDING["chunks"]:
-        keys = {chunk["id"].lower(), chunk["title"].lower()}
-        keys.update(k.lower() for k in chunk.get("retrieval_keys", []))
-        if normalized in keys:
-            return chunk
-    return None
+    return _KEYWORD_INDEX.get(keyword.strip().lower())
+
+
+# The embedding is static, so each chunk's facts are pretty-printed once at import, keeping
+# the authored key order.
+_FORMATTED_FACTS: Dict[str, str] = {
+    chunk["id"]: json.dumps(chunk["canonical_facts"], indent=2)
+    for chunk in INSTRUCTION_EMBEDDING["chunks"]
+}
 
 
 def format_chunk(keyword: str) -> str:
     chunk = find_chunk(keyword)
     if not chunk:
         return ""
-    return json.dumps(chunk["canonical_facts"], indent=2, sort_keys=True)
+    return _FORMATTED_FACTS[chunk["id"]]
+
+
+SECTION_KEYWORDS: Dict[str, str] = {
+    "image": "models.image.v1",
+    "video": "models.video.v1",
+    "pricing": "pricing.api.v1",
+    "plan": "pricing.plans.v1",
+    "create": "endpoints.create.v1",
+    "status": "endpoints.status.v1",
+}
+# One regex pass finds every section keyword in the message with plain substring semantics,
+# however the keyword list grows: the lookahead reports the longest keyword starting at each
+# position (so overlapping hits are kept), and any keyword contained in a hit is implied by it.
+_SECTION_KEYWORD_PATTERN = re.compile(
+    "(?=({}))".format("|".join(re.escape(token) for token in sorted(SECTION_KEYWORDS, key=len, reverse=True)))
+)
+_IMPLIED_KEYWORDS: Dict[str, frozenset[str]] = {
+    token: frozenset(other for other in SECTION_KEYWORDS if other in token) for token in SECTION_KEYWORDS
+}
+# Reply snippets are static per keyword, so the markdown-wrapped facts are built once, in
+# SECTION_KEYWORDS order; keywords whose chunk has no facts get no snippet.
+_SECTION_SNIPPETS: Dict[str, str] = {
+    token: f"{chunk_id} facts:\n```json\n{_FORMATTED_FACTS[chunk_id]}\n```"
+    for token, chunk_id in SECTION_KEYWORDS.items()
+    if chunk_id in _FORMATTED_FACTS
+}
+
+
+def handle_user_text(text: str) -> str:
+    """
+    Minimal text handler that returns Foldspace T2V instructions or chunked facts.
+    """
+    normalized = text.strip()
+    if not normalized:
+        return INSTRUCTION_TEXT
+
+    lowered = normalized.lower()
+    if lowered in {"help", "/help", "instructions", "menu"}:
+        return INSTRUCTION_TEXT
+
+    matched = set(_SECTION_KEYWORD_PATTERN.findall(lowered))
+    hits = set().union(*(_IMPLIED_KEYWORDS[token] for token in matched))
+    snippets = [snippet for token, snippet in _SECTION_SNIPPETS.items() if token in hits]
+
+    if snippets:
+        # One join builds the reply; the header and snippets share the same separator.
+        return "\n\n".join([f"Foldspace T2V references for `{normalized}`:", *snippets])
+
+    return (
+        "Foldspace T2V ready. Enter your prompt plus model choices.\n"
+        f"You said: {normalized}\n\nSend `instructions` for the cheat sheet."
+    )
 
 
 __all__ = [
     "INSTRUCTION_EMBEDDING",
     "INSTRUCTION_TEXT",
+    "SECTION_KEYWORDS",
     "find_chunk",
     "format_chunk",
     "get_instruction_text",
+    "handle_user_text",
 ]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timezone
+from typing import Optional
 from uuid import uuid4
 
 from uagents import Agent, Context, Protocol
@@ -9,58 +9,33 @@ from uagents_core.contrib.protocols.chat import (
     ChatAcknowledgement,
     ChatMessage,
     EndSessionContent,
-    StartSessionContent,
     TextContent,
     chat_protocol_spec,
 )
 
-from adapter import format_chunk, get_instruction_text
+from adapter import INSTRUCTION_TEXT, handle_user_text
 
 
-def create_text_chat(text: str, end_session: bool = False) -> ChatMessage:
+# Content models carry no per-message state, so the end-of-session marker and the
+# invariant instruction sheet are built (and validated) once.
+_END_SESSION = EndSessionContent(type="end-session")
+_INSTRUCTION_CONTENT = TextContent(type="text", text=INSTRUCTION_TEXT)
+
+
+def create_text_chat(
+    text: str, end_session: bool = False, timestamp: Optional[datetime] = None
+) -> ChatMessage:
     content = [TextContent(type="text", text=text)]
     if end_session:
-        content.append(EndSessionContent(type="end-session"))
-    return ChatMessage(timestamp=datetime.utcnow(), msg_id=uuid4(), content=content)
-
-
-INSTRUCTION_TEXT = get_instruction_text()
-SECTION_KEYWORDS: Dict[str, str] = {
-    "image": "models.image.v1",
-    "video": "models.video.v1",
-    "pricing": "pricing.api.v1",
-    "plan": "pricing.plans.v1",
-    "create": "endpoints.create.v1",
-    "status": "endpoints.status.v1",
-}
-
-
-def handle_user_text(text: str) -> str:
-    """
-    Minimal text handler that returns Foldspace T2V instructions or chunked facts.
-    """
-    normalized = text.strip()
-    if not normalized:
-        return INSTRUCTION_TEXT
-
-    lowered = normalized.lower()
-    if lowered in {"help", "/help", "instructions", "menu"}:
-        return INSTRUCTION_TEXT
-
-    snippets = []
-    for token, chunk_id in SECTION_KEYWORDS.items():
-        if token in lowered:
-            facts = format_chunk(chunk_id)
-            if facts:
-                snippets.append(f"{chunk_id} facts:\n```json\n{facts}\n```")
-
-    if snippets:
-        joined = "\n\n".join(snippets)
-        return f"Foldspace T2V references for `{normalized}`:\n\n{joined}"
-
-    return (
-        "Foldspace T2V ready. Enter your prompt plus model choices.\n"
-        f"You said: {normalized}\n\nSend `instructions` for the cheat sheet."
+        content.append(_END_SESSION)
+    return ChatMessage(
+        timestamp=timestamp or datetime.now(timezone.utc), msg_id=uuid4(), content=content
+    )
+
+
+def create_instruction_chat(timestamp: Optional[datetime] = None) -> ChatMessage:
+    return ChatMessage(
+        timestamp=timestamp or datetime.now(timezone.utc), msg_id=uuid4(), content=[_INSTRUCTION_CONTENT]
     )
 
 
@@ -70,15 +45,19 @@ chat_proto = Protocol(spec=chat_protocol_spec)
 
 @chat_proto.on_message(ChatMessage)
 async def handle_chat(ctx: Context, sender: str, msg: ChatMessage):
+    # One clock read per inbound message, shared by the ack and every reply.
+    now = datetime.now(timezone.utc)
+
     # 1) Send the acknowledgement for receiving the message
     await ctx.send(
         sender,
-        ChatAcknowledgement(timestamp=datetime.utcnow(), acknowledged_msg_id=msg.msg_id),
+        ChatAcknowledgement(timestamp=now, acknowledged_msg_id=msg.msg_id),
     )
 
     # 2) greet if a session starts with the Foldspace instruction sheet
-    if any(isinstance(item, StartSessionContent) for item in msg.content):
-        await ctx.send(sender, create_text_chat(INSTRUCTION_TEXT, end_session=False))
+    content_types = {item.type for item in msg.content}
+    if "start-session" in content_types:
+        await ctx.send(sender, create_instruction_chat(timestamp=now))
 
     # 3) collect all text at once
     text = msg.text()
@@ -92,7 +71,7 @@ async def handle_chat(ctx: Context, sender: str, msg: ChatMessage):
 
     # 4) keep the session open for follow-ups
     end_now = False
-    await ctx.send(sender, create_text_chat(reply, end_session=end_now))
+    await ctx.send(sender, create_text_chat(reply, end_session=end_now, timestamp=now))
 
 
 @chat_proto.on_message(ChatAcknowledgement)
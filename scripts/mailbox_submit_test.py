@@ -9,12 +9,13 @@ different agent once you have their registered handle.
 from __future__ import annotations
 
 import argparse
-import json
 import os
+import random
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from uuid import UUID, uuid4
 
+import orjson
 import requests
 from dotenv import load_dotenv
 from uagents_core.contrib.protocols.chat import ChatMessage, TextContent, chat_protocol_spec
@@ -26,6 +27,14 @@ BASE_DIR = Path(__file__).parent
 PROJECT_ROOT = BASE_DIR.parent
 DEFAULT_ENV_FILE = PROJECT_ROOT / ".env"
 
+# Both digests are fixed for a given uagents_core release; chat_protocol_spec.digest
+# rebuilds the protocol manifest on every access, so resolve them once.
+CHAT_MESSAGE_SCHEMA_DIGEST = Model.build_schema_digest(ChatMessage)
+CHAT_PROTOCOL_DIGEST = chat_protocol_spec.digest
+
+# Shared keep-alive pool so repeated submissions reuse one TLS connection.
+HTTP_SESSION = requests.Session()
+
 
 def resolve_env_file() -> Path:
     override = os.getenv("FOLDSPACE_ENV_FILE")
@@ -46,24 +55,36 @@ def resolve_env_file() -> Path:
     return DEFAULT_ENV_FILE
 
 
-def coerce_uuid(value: Optional[str]) -> UUID:
+def fast_uuid4() -> UUID:
+    """Version-4 UUID from the non-cryptographic PRNG; only for --count stress loops."""
+    return UUID(int=random.getrandbits(128), version=4)
+
+
+def coerce_uuid(value: Optional[str], factory: Callable[[], UUID] = uuid4) -> UUID:
     if not value:
-        return uuid4()
+        return factory()
     try:
         return UUID(value)
     except ValueError as exc:
         raise ValueError(f"Invalid session UUID '{value}': {exc}") from exc
 
 
-def build_envelope(identity: Identity, target: str, session: UUID, message_text: str, version: int) -> Envelope:
-    message = ChatMessage(content=[TextContent(text=message_text)])
+def build_envelope(
+    identity: Identity,
+    target: str,
+    session: UUID,
+    message_text: str,
+    version: int,
+    msg_id: Optional[UUID] = None,
+) -> Envelope:
+    message = ChatMessage(content=[TextContent(text=message_text)], msg_id=msg_id)
     envelope = Envelope(
         version=version,
         sender=identity.address,
         target=target,
         session=session,
-        schema_digest=Model.build_schema_digest(ChatMessage),
-        protocol_digest=chat_protocol_spec.digest,
+        schema_digest=CHAT_MESSAGE_SCHEMA_DIGEST,
+        protocol_digest=CHAT_PROTOCOL_DIGEST,
     )
     envelope.encode_payload(message.model_dump_json())
     envelope.sign(identity)
@@ -75,7 +96,7 @@ def submit_envelope(endpoint: str, api_key: str, envelope: Envelope, timeout: fl
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
-    payload = json.dumps(envelope.model_dump(mode="json"), default=str)
+    payload = orjson.dumps(envelope.model_dump(mode="json"), default=str)
     print(
         "[MailboxTest] Submitting envelope",
         {
@@ -88,7 +109,7 @@ def submit_envelope(endpoint: str, api_key: str, envelope: Envelope, timeout: fl
             "payloadBytes": len(payload),
         },
     )
-    response = requests.post(endpoint, headers=headers, data=payload, timeout=timeout)
+    response = HTTP_SESSION.post(endpoint, headers=headers, data=payload, timeout=timeout)
     return response
 
 
@@ -119,18 +140,29 @@ def main() -> None:
         default=10.0,
         help="HTTP timeout in seconds (default: 10).",
     )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="Number of envelopes to submit back-to-back (default: 1). Values above 1 draw ids from a fast PRNG.",
+    )
     parser.add_argument(
         "--base-url",
         help="Override Agentverse base URL. Defaults to AGENTVERSE_BASE_URL or https://agentverse.ai/.",
     )
     args = parser.parse_args()
 
-    env_file = resolve_env_file()
-    if env_file.exists():
-        load_dotenv(env_file)
-        print(f"[MailboxTest] Loaded environment variables from {env_file}")
+    # Skip the .env file entirely only when the process already carries both secrets and the
+    # base URL, so a staging AGENTVERSE_BASE_URL kept in .env is never silently ignored.
+    if os.getenv("AGENTVERSE_API_KEY") and os.getenv("AGENT_SEED_PHRASE") and os.getenv("AGENTVERSE_BASE_URL"):
+        print("[MailboxTest] Credentials and base URL found in process env; skipping env file.")
     else:
-        print(f"[MailboxTest] Warning: env file {env_file} does not exist. Relying on process env.")
+        env_file = resolve_env_file()
+        if env_file.exists():
+            load_dotenv(env_file)
+            print(f"[MailboxTest] Loaded environment variables from {env_file}")
+        else:
+            print(f"[MailboxTest] Warning: env file {env_file} does not exist. Relying on process env.")
 
     api_key = os.getenv("AGENTVERSE_API_KEY")
     if not api_key:
@@ -144,29 +176,34 @@ def main() -> None:
     if not base_url.endswith("/"):
         base_url = f"{base_url}/"
     submit_url = f"{base_url}v1/submit"
+    print(f"[MailboxTest] Submitting to {submit_url}")
 
     identity = Identity.from_seed(seed_phrase, 0)
     target = args.target or identity.address
-    session = coerce_uuid(args.session)
-
-    envelope = build_envelope(
-        identity=identity,
-        target=target,
-        session=session,
-        message_text=args.message,
-        version=args.version,
-    )
-
-    response = submit_envelope(submit_url, api_key, envelope, args.timeout)
-    print(
-        "[MailboxTest] Agentverse response",
-        {
-            "status": response.status_code,
-            "reason": response.reason,
-            "body": response.text,
-        },
-    )
-    response.raise_for_status()
+    # Single-shot runs keep os.urandom-backed uuid4(); stress loops skip the syscall per id.
+    new_uuid = fast_uuid4 if args.count > 1 else uuid4
+    session = coerce_uuid(args.session, new_uuid)
+
+    for _ in range(args.count):
+        envelope = build_envelope(
+            identity=identity,
+            target=target,
+            session=session,
+            message_text=args.message,
+            version=args.version,
+            msg_id=new_uuid(),
+        )
+
+        response = submit_envelope(submit_url, api_key, envelope, args.timeout)
+        print(
+            "[MailboxTest] Agentverse response",
+            {
+                "status": response.status_code,
+                "reason": response.reason,
+                "body": response.text,
+            },
+        )
+        response.raise_for_status()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import os
+import sys
 from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 from uagents_core.utils.registration import (
@@ -16,43 +18,57 @@ if env_override:
 else:
     ENV_FILE = DEFAULT_ENV_FILE
 
-if not ENV_FILE.exists():
-    fallback_env = BASE_DIR / ".env"
-    if fallback_env.exists():
-        print(f"[Register] Warning: {ENV_FILE} not found, falling back to {fallback_env}")
-        ENV_FILE = fallback_env
-
 # Load variables from the project root .env so local runs have the required secrets available.
-load_dotenv(ENV_FILE)
-
-agentverse_api_key = os.getenv("AGENTVERSE_API_KEY")
-if not agentverse_api_key:
-    legacy_key = os.getenv("AGENTVERSE_KEY")
-    if legacy_key:
-        print("[Register] Warning: AGENTVERSE_KEY is deprecated; please rename it to AGENTVERSE_API_KEY.")
-        agentverse_api_key = legacy_key
-    else:
-        raise RuntimeError("Missing AGENTVERSE_API_KEY in the root .env file.")
-
-agent_seed_phrase = os.getenv("AGENT_SEED_PHRASE")
-if not agent_seed_phrase:
-    raise RuntimeError("Missing AGENT_SEED_PHRASE in the root .env file.")
-
-agentverse_base_url = os.getenv("AGENTVERSE_BASE_URL")
-if not agentverse_base_url:
-    print("[Register] Warning: AGENTVERSE_BASE_URL not configured; default service URL will be assumed.")
-
-agentverse_chat_agent_id = os.getenv("AGENTVERSE_CHAT_AGENT_ID")
-if not agentverse_chat_agent_id:
-    print("[Register] Warning: AGENTVERSE_CHAT_AGENT_ID is not configured.")
-
-
-register_chat_agent(
-    "Test T2V",
-    "http://65.109.163.21/chat",
-    active=True,
-    credentials=RegistrationRequestCredentials(
-        agentverse_api_key=os.environ["AGENTVERSE_API_KEY"],
-        agent_seed_phrase=os.environ["AGENT_SEED_PHRASE"],
-    ),
-)
+# Processes launched with both secrets and AGENTVERSE_BASE_URL already exported (systemd,
+# containers, CI) skip the file; otherwise a base URL kept only in .env would be ignored.
+if not (os.getenv("AGENTVERSE_API_KEY") and os.getenv("AGENT_SEED_PHRASE") and os.getenv("AGENTVERSE_BASE_URL")):
+    if not ENV_FILE.exists():
+        fallback_env = BASE_DIR / ".env"
+        if fallback_env.exists():
+            print(f"[Register] Warning: {ENV_FILE} not found, falling back to {fallback_env}")
+            ENV_FILE = fallback_env
+
+    load_dotenv(ENV_FILE)
+
+
+def _get_required_env(name: str) -> Optional[str]:
+    value = os.environ.get(name)
+    if not value:
+        print(f"[Register] Environment variable {name!r} is required in the root .env file.", file=sys.stderr)
+        return None
+    return value
+
+
+def main() -> int:
+    agentverse_api_key = os.environ.get("AGENTVERSE_API_KEY")
+    if not agentverse_api_key:
+        agentverse_api_key = os.environ.get("AGENTVERSE_KEY")
+        if agentverse_api_key:
+            print("[Register] Warning: AGENTVERSE_KEY is deprecated; please rename it to AGENTVERSE_API_KEY.")
+        else:
+            agentverse_api_key = _get_required_env("AGENTVERSE_API_KEY")
+
+    agent_seed_phrase = _get_required_env("AGENT_SEED_PHRASE")
+    if not agentverse_api_key or not agent_seed_phrase:
+        return 1
+
+    if not os.environ.get("AGENTVERSE_BASE_URL"):
+        print("[Register] Warning: AGENTVERSE_BASE_URL not configured; default service URL will be assumed.")
+
+    if not os.environ.get("AGENTVERSE_CHAT_AGENT_ID"):
+        print("[Register] Warning: AGENTVERSE_CHAT_AGENT_ID is not configured.")
+
+    register_chat_agent(
+        "Test T2V",
+        "http://65.109.163.21/chat",
+        active=True,
+        credentials=RegistrationRequestCredentials(
+            agentverse_api_key=agentverse_api_key,
+            agent_seed_phrase=agent_seed_phrase,
+        ),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,7 +64,7 @@ start_pm2() {
   echo "[pm2] Restarting ${PM2_APP_NAME} on port ${PORT}"
   pm2 delete "${PM2_APP_NAME}" >/dev/null 2>&1 || true
   pm2 start "${python_bin}" --name "${PM2_APP_NAME}" -- \
-    -m uvicorn scripts.fastapi_server:app --host 0.0.0.0 --port "${PORT}"
+    -m uvicorn scripts.fastapi_server:app --host 0.0.0.0 --port "${PORT}" --loop uvloop --http httptools --log-level warning --no-access-log
   pm2 save
 }
 